@@ -1,111 +1,330 @@
 import os
 import time
-import requests
+import random
+import asyncio
+from collections import deque
+import aiohttp
+import orjson
 from datetime import datetime, timezone, timedelta
+from urllib.parse import urlparse
 import sys
 
 
 # Constants
 ACCESS_TOKEN = os.getenv("ACCESS_TOKEN")
 DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
-SEARCH_QUERIES = os.getenv("SEARCH_QUERIES").split(",")
-MONITORED_USERS = os.getenv("MONITORED_USERS").split(",")
+# Distinct, whitespace-stripped entries; blanks (e.g. from a trailing comma) are skipped
+SEARCH_QUERIES = list(dict.fromkeys(filter(None, map(str.strip, os.getenv("SEARCH_QUERIES", "").split(",")))))
+MONITORED_USERS = list(dict.fromkeys(filter(None, map(str.strip, os.getenv("MONITORED_USERS", "").split(",")))))
 KNOWN_LINKS_FILE = os.getenv("KNOWN_LINKS_FILE")
+ETAG_CACHE_FILE = os.getenv("ETAG_CACHE_FILE", "etag_cache.json")
 DATE_FORMAT = "%Y-%m-%d"
 DISCORD_CHAR_LIMIT = 1950  # Discord's character limit
-FIELDS = "uri,name,link,description,pictures.sizes,user.link,user.name,user.pictures.sizes,width,height,created_time,duration"
+DISCORD_EMBED_CHAR_LIMIT = 6000  # Discord's limit on embed text across a whole message
+MAX_EMBEDS_PER_MESSAGE = 10  # Discord's limit on embeds per message
+EMBED_FIELD_NAMES = ("Matched On", "Resolution", "Duration")  # Fixed fields shown on every video embed
+EMBED_FIELD_NAMES_LENGTH = sum(len(name) for name in EMBED_FIELD_NAMES)
+# Only the fields the Discord embeds use; filtered requests are cheaper against Vimeo's rate limit
+FIELDS = "name,link,description,pictures.sizes.link,user.link,user.name,user.pictures.sizes.link,width,height,created_time,duration"
+PER_PAGE = 50  # Number of latest videos fetched per search or user; later pages are never requested
+NEW_KEYWORD_SCAN_LIMIT = 10  # Latest videos posted for a newly added search or user, rather than its whole first page
 RETRY_LIMIT = 5
 DEFAULT_SLEEP_INTERVAL = 2  # Default rate limiting interval
+RATE_LIMIT_MIN_REMAINING = 2  # Start pacing requests at or below this many remaining calls...
+RATE_LIMIT_MIN_RATIO = 0.1  # ...or below this fraction of the rate limit window's quota
+BACKOFF_BASE = 0.5  # Base delay in seconds for retry backoff
+BACKOFF_CAP = 60  # Maximum delay in seconds between retries
+RETRY_BUCKET_CAPACITY = 10  # Maximum retry tokens held per host
+RETRY_BUCKET_REFILL = 0.5  # Retry tokens earned back per successful request
+CONCURRENCY = 5  # Initial number of in-flight requests per host
+AIMD_INCREASE = 0.5  # Concurrency added after each fast response
+AIMD_DECREASE = 0.5  # Concurrency multiplier after a slow or throttled response
+AIMD_TARGET_LATENCY = 1.0  # Average response time in seconds above which a host counts as congested
+AIMD_LATENCY_WINDOW = 10  # Number of recent responses averaged per host
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 16
+DISCORD_MAX_CONCURRENCY = 5  # Discord's per-webhook rate limit bucket is small
+
+# Static parts of every Vimeo and Discord request, built once instead of per call
+VIMEO_HEADERS = {"Authorization": f"Bearer {ACCESS_TOKEN}"}
+DISCORD_HEADERS = {"Content-Type": "application/json"}
+VIMEO_PARAMS = {
+    "per_page": PER_PAGE,
+    "fields": FIELDS,
+    "sort": "date",  # Sort by latest
+    "direction": "desc"  # Ensure descending order
+}
+
+# Returned instead of a response body when Vimeo reports a result page is unchanged (HTTP 304)
+NOT_MODIFIED = object()
+CONNECTION_POOL_SIZE = 16  # Maximum pooled keep-alive connections across all hosts
+DNS_CACHE_TTL = 300  # Seconds to cache resolved hostnames
+
+
+class TokenBucket:
+    """Client-side retry quota: each retry spends a token, each success earns part of one back."""
+
+    def __init__(self, capacity=RETRY_BUCKET_CAPACITY, refill_per_success=RETRY_BUCKET_REFILL):
+        self.capacity = capacity
+        self.refill_per_success = refill_per_success
+        self.tokens = capacity
+
+    def try_acquire(self):
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def deposit(self):
+        self.tokens = min(self.capacity, self.tokens + self.refill_per_success)
+
+
+class AIMDController:
+    """
+    Adaptive limit on concurrent requests to one host.
+
+    The limit grows additively while responses are fast and is cut
+    multiplicatively on slow responses, 429s and 5xx errors, at most once per
+    latency window so a single burst of congestion isn't punished repeatedly.
+    """
+
+    def __init__(self, initial=CONCURRENCY, max_concurrency=MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self.limit = float(min(initial, max_concurrency))
+        self.in_flight = 0
+        self.latencies = deque(maxlen=AIMD_LATENCY_WINDOW)
+        self.responses_since_decrease = 0
+        self.condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def record(self, latency, status):
+        self.latencies.append(latency)
+        self.responses_since_decrease += 1
+        average_latency = sum(self.latencies) / len(self.latencies)
+        if status == 429 or status >= 500 or average_latency > AIMD_TARGET_LATENCY:
+            # Responses already in flight when the limit was last cut report the same congestion
+            if self.responses_since_decrease >= len(self.latencies):
+                self.limit = max(MIN_CONCURRENCY, self.limit * AIMD_DECREASE)
+                self.responses_since_decrease = 0
+        else:
+            self.limit = min(self.max_concurrency, self.limit + AIMD_INCREASE)
+
+
+# Retry budgets and concurrency limits are tracked per host, so a degraded
+# Vimeo API doesn't throttle Discord notifications (or vice versa)
+RETRY_BUCKETS = {}
+CONCURRENCY_CONTROLLERS = {}
+
+def get_retry_bucket(url):
+    host = urlparse(url).netloc
+    if host not in RETRY_BUCKETS:
+        RETRY_BUCKETS[host] = TokenBucket()
+    return RETRY_BUCKETS[host]
+
+def get_concurrency_controller(url):
+    host = urlparse(url).netloc
+    if host not in CONCURRENCY_CONTROLLERS:
+        if host == urlparse(DISCORD_WEBHOOK_URL).netloc:
+            CONCURRENCY_CONTROLLERS[host] = AIMDController(max_concurrency=DISCORD_MAX_CONCURRENCY)
+        else:
+            CONCURRENCY_CONTROLLERS[host] = AIMDController()
+    return CONCURRENCY_CONTROLLERS[host]
 
 def read_known_links():
     if not os.path.exists(KNOWN_LINKS_FILE):
-        return set()
+        return frozenset()
     with open(KNOWN_LINKS_FILE, 'r') as file:
-        return set(line.strip() for line in file)
+        # Split the whole file in one call instead of stripping it line by line.
+        # The history is only ever read, so it's loaded straight into a frozenset.
+        return frozenset(file.read().split())
+
+def open_known_links():
+    """
+    Open the known links file for appending; existing links are never re-read or rewritten.
 
-def write_known_links(new_links):
+    If the file doesn't end with a newline (e.g. after a manual edit), one is
+    added so the first new link doesn't run into the last known one.
+    """
+    missing_newline = False
+    if os.path.exists(KNOWN_LINKS_FILE) and os.path.getsize(KNOWN_LINKS_FILE) > 0:
+        with open(KNOWN_LINKS_FILE, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            missing_newline = file.read(1) != b'\n'
+    file = open(KNOWN_LINKS_FILE, 'a')
+    if missing_newline:
+        file.write('\n')
+    return file
+
+def write_known_links(file, new_links):
     """
     Append new links to the known links file to maintain order.
-    
+
+    The file is flushed straight away so the links survive a crash later in the run.
+
     Args:
-        new_links (set): A set of new links to append.
+        file: The known links file, as returned by open_known_links().
+        new_links (list): The new links to append.
     """
     if not new_links:
         return
-    with open(KNOWN_LINKS_FILE, 'a') as file:
-        for link in new_links:
-            file.write(f"{link}\n")
+    for link in new_links:
+        file.write(f"{link}\n")
+    file.flush()
 
-def handle_rate_limiting(headers):
-    if 'X-RateLimit-Remaining' in headers and 'X-RateLimit-Reset' in headers:
+def read_etag_cache():
+    """
+    Load the response validators stored by the previous run.
+
+    Returns:
+        dict: Maps each search query and "User: <id>" label to the ETag and
+            Last-Modified values of its last successful fetch, and an 'incomplete'
+            flag if some of its videos couldn't be delivered.
+    """
+    if not os.path.exists(ETAG_CACHE_FILE):
+        return {}
+    try:
+        with open(ETAG_CACHE_FILE, 'rb') as file:
+            cache = orjson.loads(file.read())
+    except ValueError:
+        return {}  # A corrupt cache only costs one unconditional fetch per query; known links still end each scan
+    if not isinstance(cache, dict):
+        return {}  # Valid JSON of the wrong shape is as unusable as a corrupt file
+    return {keyword: validators for keyword, validators in cache.items() if isinstance(validators, dict)}
+
+def write_etag_cache(cache):
+    with open(ETAG_CACHE_FILE, 'wb') as file:
+        file.write(orjson.dumps(cache, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE))
+
+async def handle_rate_limiting(headers):
+    if 'X-RateLimit-Remaining' not in headers or 'X-RateLimit-Reset' not in headers:
+        return
+
+    try:
         remaining = int(headers['X-RateLimit-Remaining'])
-        reset_time = headers['X-RateLimit-Reset']
+        limit = int(headers.get('X-RateLimit-Limit', 0)) or remaining or 1
+    except ValueError:
+        return  # Unreadable quota headers mustn't turn a successful response into a retry
+    if remaining > RATE_LIMIT_MIN_REMAINING and remaining / limit > RATE_LIMIT_MIN_RATIO:
+        return  # Plenty of quota left, no need to slow down
 
+    reset_time = headers['X-RateLimit-Reset']
+    try:
+        # Attempt to parse reset_time as a UNIX timestamp
+        reset_datetime = datetime.fromtimestamp(float(reset_time), tz=timezone.utc)
+    except ValueError:
         try:
-            # Attempt to parse reset_time as a UNIX timestamp
-            reset_datetime = datetime.fromtimestamp(int(reset_time), tz=timezone.utc)
-        except (ValueError, TypeError):
-            try:
-                # Fallback: parse as ISO 8601 string
-                reset_datetime = datetime.strptime(reset_time, '%Y-%m-%dT%H:%M:%S%z')
-            except ValueError:
-                time.sleep(DEFAULT_SLEEP_INTERVAL)
-                return
-
-        current_time = datetime.now(timezone.utc)
-        if remaining <= 1:
-            sleep_time = (reset_datetime - current_time).total_seconds() + 1
-            time.sleep(max(sleep_time, 0))
-        else:
-            time.sleep(DEFAULT_SLEEP_INTERVAL)
+            # Fallback: parse as ISO 8601 string (fromisoformat only accepts 'Z' from Python 3.11)
+            reset_datetime = datetime.fromisoformat(reset_time.replace('Z', '+00:00'))
+            if reset_datetime.tzinfo is None:
+                reset_datetime = reset_datetime.replace(tzinfo=timezone.utc)
+        except ValueError:
+            await asyncio.sleep(DEFAULT_SLEEP_INTERVAL)
+            return
+
+    current_time = datetime.now(timezone.utc)
+    seconds_to_reset = (reset_datetime - current_time).total_seconds()
+    if remaining <= 1:
+        sleep_time = seconds_to_reset + 1
     else:
-        time.sleep(DEFAULT_SLEEP_INTERVAL)
+        # Spread the remaining quota evenly over the rest of the window
+        sleep_time = seconds_to_reset / remaining
+    await asyncio.sleep(max(sleep_time, 0))
 
-def request_with_retries(url, headers, params=None, json=None, method="get"):
+async def read_retry_after(response):
+    """Seconds to wait before retrying a 429 or 503, or None if the server didn't say."""
+    try:
+        # Discord gives the exact wait in the body; its Retry-After header is rounded up
+        return float(orjson.loads(await response.read())['retry_after'])
+    except (ValueError, KeyError, TypeError):
+        pass
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (ValueError, TypeError):
+        return None
+
+def retry_delay(attempt, retry_after=None):
+    """Exponential backoff with jitter, unless the server said how long to wait."""
+    if retry_after is not None:
+        return retry_after
+    return min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) + random.uniform(0, BACKOFF_BASE)
+
+async def request_with_retries(session, url, headers, params=None, data=None, method="get", validators=None):
+    bucket = get_retry_bucket(url)
+    controller = get_concurrency_controller(url)
     for attempt in range(RETRY_LIMIT):
+        retry_after = None
         try:
-            if method.lower() == "get":
-                response = requests.get(url, headers=headers, params=params)
-            elif method.lower() == "post":
-                response = requests.post(url, headers=headers, json=json)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            response.raise_for_status()
-            handle_rate_limiting(response.headers)
-
-            if method.lower() == "get":
-                return response.json()
-            else:
-                return None  # Webhook does not return JSON
-        except requests.exceptions.RequestException as e:
-            time.sleep(DEFAULT_SLEEP_INTERVAL)
-        except ValueError as e:
-            time.sleep(DEFAULT_SLEEP_INTERVAL)
+            async with controller:
+                start_time = time.monotonic()
+                if method.lower() == "get":
+                    request = session.get(url, headers=headers, params=params)
+                elif method.lower() == "post":
+                    request = session.post(url, headers=headers, data=data)
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
+
+                async with request as response:
+                    controller.record(time.monotonic() - start_time, response.status)
+                    if response.status in (429, 503):
+                        retry_after = await read_retry_after(response)
+                    response.raise_for_status()
+                    bucket.deposit()
+                    await handle_rate_limiting(response.headers)
+
+                    if response.status == 304:
+                        return NOT_MODIFIED
+                    if method.lower() == "get":
+                        result = orjson.loads(await response.read())
+                        if validators is not None:
+                            # Remember the validators so the next poll can be conditional
+                            validators['etag'] = response.headers.get('ETag')
+                            # Without a Last-Modified header, the time of this fetch is the next best thing
+                            validators['last_modified'] = response.headers.get('Last-Modified') or response.headers.get('Date')
+                        return result
+                    else:
+                        return True  # Webhook does not return JSON
+        except aiohttp.ClientResponseError as e:
+            if e.status != 429 and e.status < 500:
+                return None  # Client errors won't succeed on retry
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            pass  # Connection problems and malformed responses are retried
+
+        if retry_after is not None and retry_after > BACKOFF_CAP:
+            break  # The server wants a longer wait than we'll block for; the next run picks this up
+        if attempt == RETRY_LIMIT - 1 or not bucket.try_acquire():
+            break  # Out of attempts, or this host's retry quota is exhausted
+        await asyncio.sleep(retry_delay(attempt, retry_after))
     return None
 
-def search_vimeo(keyword, per_page=10):
+def conditional_headers(validators):
+    """Vimeo request headers asking to skip the body if the results haven't changed since the last poll."""
+    if not validators.get('etag') and not validators.get('last_modified'):
+        return VIMEO_HEADERS
+    headers = dict(VIMEO_HEADERS)
+    if validators.get('etag'):
+        headers["If-None-Match"] = validators['etag']
+    if validators.get('last_modified'):
+        headers["If-Modified-Since"] = validators['last_modified']
+    return headers
+
+async def search_vimeo(session, keyword, validators):
     url = "https://api.vimeo.com/videos"
-    headers = {"Authorization": f"Bearer {ACCESS_TOKEN}"}
-    params = {
-        "query": keyword,
-        "per_page": per_page,
-        "fields": FIELDS,
-        "sort": "date",  # Sort by latest
-        "direction": "desc"  # Ensure descending order
-    }
-    return request_with_retries(url, headers, params=params)
+    params = {**VIMEO_PARAMS, "query": keyword}
+    return await request_with_retries(session, url, conditional_headers(validators), params=params, validators=validators)
 
-def get_user_uploads(user_id, per_page=10):
+async def get_user_uploads(session, user_id, validators):
     url = f"https://api.vimeo.com/users/{user_id}/videos"
-    headers = {"Authorization": f"Bearer {ACCESS_TOKEN}"}
-    params = {
-        "per_page": per_page,
-        "fields": FIELDS,
-        "sort": "date",
-        "direction": "desc"
-    }
-    return request_with_retries(url, headers, params=params)
+    return await request_with_retries(session, url, conditional_headers(validators), params=VIMEO_PARAMS, validators=validators)
 
 def extract_video_links(data):
     links = set()
@@ -129,137 +348,223 @@ def format_duration(seconds):
     except (TypeError, ValueError):
         return "N/A"
 
-def send_detailed_to_discord(video_data, keyword):
-    embeds = []
-    for video in video_data:
-        description = video.get('description', 'No description available')
-        description = trim_text(description, 4096)
-
-        user = video.get('user', {})
-        user_name = user.get('name', 'Unknown User')
-        user_link = user.get('link', '')
-
-        # Attempt to get user's profile picture
-        user_avatar_url = None
-        if user.get('pictures') and user['pictures'].get('sizes'):
-            # Use the highest resolution profile picture
-            user_avatar_url = user['pictures']['sizes'][-1].get('link')
-
-        # Format duration
-        duration_seconds = video.get('duration')
-        formatted_duration = format_duration(duration_seconds)
-
-        fields = [
-            {
-                "name": "Matched On",
-                "value": trim_text(keyword, 1024),
-                "inline": True
-            },
-            {
-                "name": "Resolution",
-                "value": trim_text(f"{video.get('width', 'N/A')}x{video.get('height', 'N/A')}", 1024),
-                "inline": True
-            },
-            {
-                "name": "Duration",
-                "value": trim_text(formatted_duration, 1024),
-                "inline": True
-            }
-        ]
-
-        title = trim_text(video.get('name', 'No Title'), 256)
-
-        # Extract and format the upload timestamp
-        created_time = video.get('created_time')
-        timestamp = None
-        if created_time:
-            try:
-                # Remove 'Z' if present and parse ISO format
-                timestamp = datetime.fromisoformat(created_time.rstrip('Z')).replace(tzinfo=timezone.utc).isoformat()
-            except ValueError:
-                pass
-
-        embed = {
-            "title": title,
-            "url": video.get('link', ''),
-            "description": description,
-            "image": {
-                "url": video.get('pictures', {}).get('sizes', [{}])[-1].get('link', '')  # Use highest resolution thumbnail
-            },
-            "fields": fields,
-            "author": {
-                "name": user_name,
-                "url": user_link,
-                "icon_url": user_avatar_url  # Add the avatar icon to the author field
-            }
+def format_timestamp(created_time):
+    """Convert Vimeo's created_time to the UTC ISO 8601 timestamp Discord expects, or None if invalid."""
+    try:
+        # Remove 'Z' if present and parse ISO format
+        return datetime.fromisoformat(created_time.rstrip('Z')).replace(tzinfo=timezone.utc).isoformat()
+    except ValueError:
+        return None
+
+def collect_new_videos(responses, keywords, known_links, new_videos, full_scan_keywords=(), new_keywords=()):
+    """
+    Record the videos in each response that haven't been seen before.
+
+    Results are sorted newest first, so a response is only scanned up to its
+    first known video: everything after it was already seen by earlier runs.
+
+    Args:
+        responses (list): Vimeo responses, in the same order as keywords. Failed
+            requests (None or an exception) and NOT_MODIFIED results are skipped.
+        keywords (list): The keyword or "User: <id>" label each response was found by.
+        known_links (frozenset): Links recorded by previous runs.
+        new_videos (dict): Maps link to (video_data, keyword); updated in place.
+        full_scan_keywords (set): Keywords to scan past known videos, because they
+            were just added or their last fetch or delivery failed. Known links are
+            shared by every keyword, so another one may have recorded a video newer
+            than some this keyword hasn't scanned yet.
+        new_keywords (set): Keywords just added, whose history nobody has seen. Only
+            their latest NEW_KEYWORD_SCAN_LIMIT videos are checked, so adding one
+            doesn't flood Discord with its back catalogue.
+    """
+    for keyword, response in zip(keywords, responses):
+        if isinstance(response, BaseException) or not response or response is NOT_MODIFIED:
+            continue
+        items = response.get('data', [])
+        if keyword in new_keywords:
+            items = items[:NEW_KEYWORD_SCAN_LIMIT]
+        for item in items:
+            link = item.get('link')
+            if not link or link in new_videos:
+                continue  # Already found by another query in this run
+            if link in known_links:
+                if keyword in full_scan_keywords:
+                    continue
+                break
+            new_videos[link] = (item, keyword)
+
+def batch_embeds(embeds):
+    """
+    Group embeds into as few messages as Discord allows.
+
+    A message holds at most 10 embeds, and their text must not exceed
+    6000 characters combined.
+
+    Args:
+        embeds (iterable): (embed, length) pairs as returned by build_embed, in order.
+
+    Yields:
+        list: The embeds for one message.
+    """
+    batch = []
+    batch_length = 0
+    for embed, length in embeds:
+        if batch and (len(batch) == MAX_EMBEDS_PER_MESSAGE or batch_length + length > DISCORD_EMBED_CHAR_LIMIT):
+            yield batch
+            batch = []
+            batch_length = 0
+        batch.append(embed)
+        batch_length += length
+    if batch:
+        yield batch
+
+def build_embed(video, keyword):
+    """
+    Build the Discord embed for one video, trimmed to fit Discord's limits.
+
+    Returns:
+        tuple: The embed, and how many of its characters count towards
+            Discord's per-message limit.
+    """
+    description = video.get('description', 'No description available')
+    description = trim_text(description, 4096)
+
+    user = video.get('user', {})
+    user_name = user.get('name', 'Unknown User')
+    user_link = user.get('link', '')
+
+    # Attempt to get user's profile picture
+    user_avatar_url = None
+    if user.get('pictures') and user['pictures'].get('sizes'):
+        # Use the highest resolution profile picture
+        user_avatar_url = user['pictures']['sizes'][-1].get('link')
+
+    # Format duration
+    duration_seconds = video.get('duration')
+    formatted_duration = format_duration(duration_seconds)
+    resolution = f"{video.get('width', 'N/A')}x{video.get('height', 'N/A')}"
+
+    # Field values are short by construction, well under Discord's 1024 character limit,
+    # so only the free-text title and description need trimming
+    fields = [
+        {"name": name, "value": value, "inline": True}
+        for name, value in zip(EMBED_FIELD_NAMES, (keyword, resolution, formatted_duration))
+    ]
+
+    title = trim_text(video.get('name', 'No Title'), 256)
+
+    # Extract and format the upload timestamp
+    created_time = video.get('created_time')
+    timestamp = format_timestamp(created_time) if created_time else None
+
+    embed = {
+        "title": title,
+        "url": video.get('link', ''),
+        "description": description,
+        "image": {
+            "url": video.get('pictures', {}).get('sizes', [{}])[-1].get('link', '')  # Use highest resolution thumbnail
+        },
+        "fields": fields,
+        "author": {
+            "name": user_name,
+            "url": user_link,
+            "icon_url": user_avatar_url  # Add the avatar icon to the author field
         }
+    }
 
-        # Only include the timestamp if it's valid
-        if timestamp:
-            embed['timestamp'] = timestamp
+    # Only include the timestamp if it's valid
+    if timestamp:
+        embed['timestamp'] = timestamp
 
-        # Calculate total embed length to ensure it doesn't exceed Discord's limit
-        total_embed_length = len(title) + len(description)
-        for field in fields:
-            total_embed_length += len(field['name']) + len(field['value'])
+    # Calculate total embed length to ensure it doesn't exceed Discord's limit
+    total_embed_length = (len(title) + len(description) + len(user_name or '') + EMBED_FIELD_NAMES_LENGTH
+                          + len(keyword) + len(resolution) + len(formatted_duration))
 
-        if total_embed_length > 6000:
-            # Reduce description if total length exceeds 6000
-            max_desc_length = 6000 - (total_embed_length - len(description))
-            description = trim_text(description, max_desc_length)
-            embed['description'] = description
+    if total_embed_length > DISCORD_EMBED_CHAR_LIMIT:
+        # Reduce description if total length exceeds 6000
+        max_desc_length = DISCORD_EMBED_CHAR_LIMIT - (total_embed_length - len(description))
+        total_embed_length -= len(description)
+        description = trim_text(description, max_desc_length)
+        total_embed_length += len(description)
+        embed['description'] = description
 
-        embeds.append(embed)
+    return embed, total_embed_length
+
+async def send_detailed_to_discord(session, video_data, keyword, known_links_file):
+    """
+    Send one keyword's new videos to Discord, recording each message's links as soon as it's delivered.
 
-    # Now, send the embeds in batches of up to 10
-    MAX_EMBEDS_PER_MESSAGE = 10
-    headers = {"Content-Type": "application/json"}
-    
+    Returns:
+        list: The links that were delivered.
+    """
+    # Build every embed before posting any, so a malformed video fails the group up front
+    # rather than after some of its messages were already delivered
+    embeds = [build_embed(video, keyword) for video in video_data]
+
+    # Now, send the embeds in as few messages as Discord's limits allow
     # Use a more descriptive content title
     content_title = f"User Upload: {keyword.split(': ')[-1]}" if keyword.startswith("User:") else f"Keyword Match: {keyword}"
 
-    for i in range(0, len(embeds), MAX_EMBEDS_PER_MESSAGE):
-        batch_embeds = embeds[i:i+MAX_EMBEDS_PER_MESSAGE]
-        if i == 0:
-            data = {
-                "content": f"New videos found for {content_title}",
-                "embeds": batch_embeds
-            }
+    sent_links = []
+    for i, batch in enumerate(batch_embeds(embeds)):
+        # Groups are sent concurrently, so label every message, not just the first,
+        # in case another group's messages land between them
+        data = {
+            "content": f"New videos found for {content_title}" + (" (continued)" if i else ""),
+            "embeds": batch
+        }
+        # Serialize each message once, rather than again on every retry
+        body = orjson.dumps(data)
+        if await request_with_retries(session, DISCORD_WEBHOOK_URL, DISCORD_HEADERS, data=body, method="post"):
+            batch_links = [embed['url'] for embed in batch]
+            write_known_links(known_links_file, batch_links)
+            sent_links.extend(batch_links)
+    return sent_links
+
+async def run():
+    # A dictionary to store unique new videos, mapping link to (video_data, found_by_keyword).
+    # This prevents posting the same video twice if found by multiple queries in the same run.
+    new_videos_to_post = {}
+
+    # Each query or user is labelled with the keyword its videos are reported under
+    keywords = SEARCH_QUERIES + [f"User: {user_id}" for user_id in MONITORED_USERS]
+
+    # Validators from the previous run, only kept for the queries and users still being monitored
+    etag_cache = read_etag_cache()
+    validators_by_keyword = {keyword: etag_cache.get(keyword, {}) for keyword in keywords}
+
+    # A single pooled session reuses TCP/TLS connections to Vimeo and Discord across all calls
+    connector = aiohttp.TCPConnector(limit=CONNECTION_POOL_SIZE, ttl_dns_cache=DNS_CACHE_TTL)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # Fetch keyword searches and user uploads concurrently
+        tasks = [search_vimeo(session, query, validators_by_keyword[query]) for query in SEARCH_QUERIES] + \
+                [get_user_uploads(session, user_id, validators_by_keyword[f"User: {user_id}"]) for user_id in MONITORED_USERS]
+        responses = await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Only load the link history when there are videos to check against it,
+        # e.g. runs where every search came back 304 Not Modified skip it entirely
+        if any(isinstance(response, dict) and response.get('data') for response in responses):
+            known_links = read_known_links()
         else:
-            data = {
-                "embeds": batch_embeds
-            }
-        request_with_retries(DISCORD_WEBHOOK_URL, headers, json=data, method="post")
-
-def main():
-    try:
-        known_links = read_known_links()
-        # A dictionary to store unique new videos, mapping link to (video_data, found_by_keyword).
-        # This prevents posting the same video twice if found by multiple queries in the same run.
-        new_videos_to_post = {}
-
-        # Step 1: Search for videos by keywords
-        for query in SEARCH_QUERIES:
-            if not query: continue # Skip empty queries
-            response = search_vimeo(query)
-            if response:
-                for item in response.get('data', []):
-                    link = item.get('link')
-                    # Check if the video is new (not in file) AND not already found in this run
-                    if link and link not in known_links and link not in new_videos_to_post:
-                        new_videos_to_post[link] = (item, query)
-
-        # Step 2: Check for videos uploaded by monitored users
-        for user_id in MONITORED_USERS:
-            if not user_id: continue # Skip empty user IDs
-            response = get_user_uploads(user_id)
-            if response:
-                for item in response.get('data', []):
-                    link = item.get('link')
-                    # Check if the video is new (not in file) AND not already found in this run
-                    if link and link not in known_links and link not in new_videos_to_post:
-                        keyword = f"User: {user_id}"
-                        new_videos_to_post[link] = (item, keyword)
+            known_links = frozenset()
+
+        # Steps 1 and 2: Collect new videos from keyword searches, then from monitored users
+        # Scan past known links for keywords flagged last run, and for ones missing from an
+        # existing cache because they were just added. Without a cache there's no telling
+        # which keywords are new, so each one stops at its first known link as usual
+        new_keywords = {keyword for keyword in keywords if etag_cache and keyword not in etag_cache}
+        full_scan_keywords = new_keywords | {keyword for keyword in keywords
+                                             if validators_by_keyword[keyword].get('incomplete')}
+        collect_new_videos(responses, keywords, known_links, new_videos_to_post, full_scan_keywords, new_keywords)
+        for keyword, response in zip(keywords, responses):
+            if isinstance(response, dict):
+                validators_by_keyword[keyword].pop('incomplete', None)
+            elif keyword in new_keywords:
+                # Leave a new query or user out of the cache, so it's still treated as new next run
+                del validators_by_keyword[keyword]
+            elif response is not NOT_MODIFIED:
+                # The fetch failed, so scan this query or user in full once it succeeds again
+                validators_by_keyword[keyword]['incomplete'] = True
 
         # Step 3: If new videos were found, process and send them
         if new_videos_to_post:
@@ -269,15 +574,32 @@ def main():
                 if keyword not in videos_to_send_by_keyword:
                     videos_to_send_by_keyword[keyword] = []
                 videos_to_send_by_keyword[keyword].append(video_data)
-            
-            # Send notifications for each group
-            for keyword, video_list in videos_to_send_by_keyword.items():
-                send_detailed_to_discord(video_list, keyword)
-            
-            # Step 4: Update the known links file
-            newly_found_links = set(new_videos_to_post.keys())
-            write_known_links(newly_found_links)
-            
+
+            # Send notifications for all groups concurrently, and step 4: record each link in
+            # the known links file as soon as Discord has it, so a crash doesn't re-notify it
+            groups = list(videos_to_send_by_keyword.items())
+            with open_known_links() as known_links_file:
+                sends = [send_detailed_to_discord(session, video_list, keyword, known_links_file)
+                         for keyword, video_list in groups]
+                results = await asyncio.gather(*sends, return_exceptions=True)
+                os.fsync(known_links_file.fileno())
+
+            for (keyword, video_list), sent_links in zip(groups, results):
+                unsent = isinstance(sent_links, BaseException) or len(sent_links) < len(video_list)
+                if unsent and keyword in new_keywords:
+                    # Still new next run, so its latest videos are checked again and the unsent ones retried
+                    del validators_by_keyword[keyword]
+                elif unsent:
+                    # Fetch and scan this query or user in full next run so the unsent videos are retried
+                    validators_by_keyword[keyword].clear()
+                    validators_by_keyword[keyword]['incomplete'] = True
+
+    # Step 5: Save the validators only once the results they describe have been recorded
+    write_etag_cache(validators_by_keyword)
+
+def main():
+    try:
+        asyncio.run(run())
     except Exception as e:
         pass
 